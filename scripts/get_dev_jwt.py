@@ -22,19 +22,25 @@ Usage:
     ./get_dev_jwt                           # Use testing@percolationlabs.ai (deterministic tenant)
     ./get_dev_jwt --email someone@gmail.com # Use custom email (random tenant)  
     ./get_dev_jwt -o custom_token.json      # Save to custom location
+    ./get_dev_jwt --batch 10                # Register 10 devices concurrently (test_jwt_token_0.json ...)
 """
 
 import asyncio
-import json
 import sys
 import os
 import argparse
 import base64
 from datetime import datetime
-from typing import Dict, Any, Optional
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 import httpx
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
-from cryptography.hazmat.primitives import serialization
+import orjson
+from nacl.signing import SigningKey
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 from dotenv import load_dotenv
 
@@ -43,77 +49,108 @@ from dotenv import load_dotenv
 BASE_URL = "https://p8fs.percolationlabs.ai"
 DEFAULT_EMAIL = "testing@percolationlabs.ai"
 DEFAULT_OUTPUT = "test_jwt_token.json"
+MAX_CONNECTIONS = 100
 
 load_dotenv()
 
+# Fixed DER headers for Ed25519 keys (RFC 8410): PKCS#8 private key and
+# SubjectPublicKeyInfo, each followed by the 32 raw key bytes
+ED25519_PKCS8_PREFIX = bytes.fromhex("302e020100300506032b657004220420")
+ED25519_SPKI_PREFIX = bytes.fromhex("302a300506032b6570032100")
+
+def der_to_pem(der: bytes, label: str) -> str:
+    """Wrap DER bytes in a PEM block"""
+    b64 = base64.b64encode(der).decode('ascii')
+    body = "\n".join(b64[i:i + 64] for i in range(0, len(b64), 64))
+    return f"-----BEGIN {label}-----\n{body}\n-----END {label}-----\n"
+
+def pub_pem_from_b64(public_key_b64: str) -> str:
+    """Derive the SubjectPublicKeyInfo PEM from a saved raw base64 public key"""
+    return der_to_pem(ED25519_SPKI_PREFIX + base64.b64decode(public_key_b64), "PUBLIC KEY")
+
+def generate_device_keys() -> Tuple[str, str]:
+    """Generate an Ed25519 device key pair (libsodium); returns (private PEM, public base64)"""
+    signing_key = SigningKey.generate()
+    private_key_pem = der_to_pem(ED25519_PKCS8_PREFIX + bytes(signing_key), "PRIVATE KEY")
+    public_key_b64 = base64.b64encode(bytes(signing_key.verify_key)).decode('ascii')
+    return private_key_pem, public_key_b64
+
+# Shared HTTP client so repeated calls reuse pooled keep-alive connections
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=MAX_CONNECTIONS),
+        )
+    return _client
+
+async def close_client() -> None:
+    """Close the shared HTTP client if it was created"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def get_dev_token() -> Optional[str]:
+    """Read the dev token from the environment, reporting an error if it is missing"""
+    dev_token = os.getenv("P8FS_DEV_TOKEN_SECRET")
+    if not dev_token:
+        print("ERROR: P8FS_DEV_TOKEN_SECRET not set", file=sys.stderr)
+        print("export P8FS_DEV_TOKEN_SECRET='p8fs-dev-dHMZAB_dK8JR6ps-zLBSBTfBeoNdXu2KcpNywjDfD58'", file=sys.stderr)
+    return dev_token
+
 async def get_dev_jwt_token(email: str, output_file: str) -> Optional[Dict[str, Any]]:
     """Get development JWT token via dev endpoint"""
     
     # Get dev token from environment
-    dev_token = os.getenv("P8FS_DEV_TOKEN_SECRET")
+    dev_token = get_dev_token()
     if not dev_token:
-        print("ERROR: P8FS_DEV_TOKEN_SECRET not set", file=sys.stderr)
-        print("export P8FS_DEV_TOKEN_SECRET='p8fs-dev-dHMZAB_dK8JR6ps-zLBSBTfBeoNdXu2KcpNywjDfD58'", file=sys.stderr)
         return None
     
     # Generate Ed25519 key pair
-    private_key = Ed25519PrivateKey.generate()
-    public_key = private_key.public_key()
-    
-    # Serialize keys
-    private_key_pem = private_key.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption()
-    ).decode('utf-8')
-    
-    public_key_pem = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    ).decode('utf-8')
-    
-    public_key_bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.Raw,
-        format=serialization.PublicFormat.Raw
-    )
-    public_key_b64 = base64.b64encode(public_key_bytes).decode('utf-8')
+    private_key_pem, public_key_b64 = generate_device_keys()
     
     # Make request
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(
-                f"{BASE_URL}/api/v1/auth/dev/register",
-                json={
-                    "email": email,
-                    "public_key": public_key_b64,
-                    "device_info": {
-                        "device_name": "Dev JWT Generator",
-                        "device_type": "desktop",
-                        "os_version": "Development",
-                        "app_version": "dev-1.0.0",
-                    },
+    client = get_client()
+    try:
+        response = await client.post(
+            f"{BASE_URL}/api/v1/auth/dev/register",
+            json={
+                "email": email,
+                "public_key": public_key_b64,
+                "device_info": {
+                    "device_name": "Dev JWT Generator",
+                    "device_type": "desktop",
+                    "os_version": "Development",
+                    "app_version": "dev-1.0.0",
                 },
-                headers={
-                    "X-Dev-Token": dev_token,
-                    "X-Dev-Email": email,
-                    "X-Dev-Code": "123456",
-                }
-            )
-            
-            if response.status_code != 200:
-                print(f"ERROR: Request failed {response.status_code}: {response.text}", file=sys.stderr)
-                return None
-                
-            token_data = response.json()
-            access_token = token_data.get("access_token")
+            },
+            headers={
+                "X-Dev-Token": dev_token,
+                "X-Dev-Email": email,
+                "X-Dev-Code": "123456",
+            }
+        )
+        
+        if response.status_code != 200:
+            print(f"ERROR: Request failed {response.status_code}: {response.text}", file=sys.stderr)
+            return None
             
-            if not access_token:
-                print("ERROR: No access token received", file=sys.stderr)
-                return None
-                
-        except Exception as e:
-            print(f"ERROR: {e}", file=sys.stderr)
+        token_data = response.json()
+        access_token = token_data.get("access_token")
+        
+        if not access_token:
+            print("ERROR: No access token received", file=sys.stderr)
             return None
+            
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return None
     
     # Save token with key pair
     token_info = {
@@ -126,20 +163,56 @@ async def get_dev_jwt_token(email: str, output_file: str) -> Optional[Dict[str,
         "email": email,
         "device_keys": {
             "private_key_pem": private_key_pem,
-            "public_key_pem": public_key_pem,
             "public_key_b64": public_key_b64
         }
     }
     
     try:
-        with open(output_file, 'w') as f:
-            json.dump(token_info, f, indent=2)
+        Path(output_file).write_bytes(
+            orjson.dumps(token_info, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        )
         print(f"Token saved to {output_file}")
         return token_info
     except Exception as e:
         print(f"ERROR: Failed to save token: {e}", file=sys.stderr)
         return None
 
+def batch_output_files(output_file: str, count: int) -> List[str]:
+    """Number the output file per device: token.json -> token_0.json, token_1.json, ..."""
+    stem, suffix = os.path.splitext(output_file)
+    return [f"{stem}_{i}{suffix}" for i in range(count)]
+
+async def run(email: str, output_file: str, batch: int = 1) -> bool:
+    """Get one token (or a concurrent batch) and release pooled connections afterwards"""
+    # Check once up front so a missing token is not reported per registration
+    if not get_dev_token():
+        return False
+    try:
+        if batch <= 1:
+            return await get_dev_jwt_token(email, output_file) is not None
+        
+        # Registrations overlap on the shared client instead of running back to back;
+        # cap them at the pool size so none waits out the pool timeout
+        semaphore = asyncio.Semaphore(MAX_CONNECTIONS)
+        
+        async def register(path: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await get_dev_jwt_token(email, path)
+        
+        results = await asyncio.gather(
+            *(register(path) for path in batch_output_files(output_file, batch))
+        )
+        return all(result is not None for result in results)
+    finally:
+        await close_client()
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description="Get P8FS development JWT token")
     parser.add_argument(
@@ -152,22 +225,31 @@ def main():
         default=DEFAULT_OUTPUT,
         help=f"Output file (default: {DEFAULT_OUTPUT})"
     )
+    parser.add_argument(
+        "--batch",
+        type=positive_int,
+        default=1,
+        help="Register N devices concurrently, saving numbered output files (default: 1)"
+    )
     args = parser.parse_args()
     
-    result = asyncio.run(get_dev_jwt_token(args.email, args.output))
+    runner = uvloop.run if uvloop else asyncio.run
+    ok = runner(run(args.email, args.output, args.batch))
     
-    if not result:
+    if not ok:
         sys.exit(1)
 
 if __name__ == "__main__":
     main()
 
 # Example: Using saved device keys for message signing
+# (signing requires `pip install cryptography`; the script itself only needs pynacl)
 # 
 # import json
 # import base64
 # from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 # from cryptography.hazmat.primitives import serialization
+# from get_dev_jwt import pub_pem_from_b64
 # 
 # def sign_message_with_device_key(message: str, token_file: str = "test_jwt_token.json") -> str:
 #     """Sign a message with the saved device private key"""
@@ -187,8 +269,16 @@ if __name__ == "__main__":
 #     )
 #     
 #     signature = private_key.sign(message.encode('utf-8'))
-#     return base64.b64encode(signature).decode('utf-8')
+#     return base64.b64encode(signature).decode('ascii')
+# 
+# def public_key_pem_from_device_key(token_file: str = "test_jwt_token.json") -> str:
+#     """Derive the device public key PEM (no longer saved) from the saved base64 key"""
+#     with open(token_file, 'r') as f:
+#         token_data = json.load(f)
+#     
+#     return pub_pem_from_b64(token_data["device_keys"]["public_key_b64"])
 # 
 # # Usage:
 # # signature = sign_message_with_device_key("Hello, P8-FS!")
-# # print(f"Signature: {signature}")
\ No newline at end of file
+# # print(f"Signature: {signature}")
+# # public_key_pem = public_key_pem_from_device_key()
\ No newline at end of file
@@ -20,35 +20,97 @@ Prerequisites:
     ./get_dev_jwt  # Creates test_jwt_token.json with JWT + device keys
 """
 import asyncio
-import json
 import sys
 import os
-import httpx
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+import aiohttp
+import orjson
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 API_BASE = "https://p8fs.percolationlabs.ai"
 TOKEN_FILE = "test_jwt_token.json"
 
-def load_jwt_token() -> str:
-    """Load JWT token from file created by get_dev_jwt"""
-    if not os.path.exists(TOKEN_FILE):
+# SSE framing
+SSE_DATA_PREFIX = b"data: "
+SSE_DATA_PREFIX_LEN = len(SSE_DATA_PREFIX)
+SSE_DONE = b"[DONE]"
+SSE_READ_CHUNK_SIZE = 16384
+
+# When stdout is not a terminal, batch writes until a newline or this many seconds pass
+PIPE_FLUSH_INTERVAL = 0.05
+
+# Shared HTTP session so repeated calls reuse pooled keep-alive connections
+_session: Optional[aiohttp.ClientSession] = None
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session, creating it on first use"""
+    global _session
+    if _session is None:
+        _session = aiohttp.ClientSession(
+            # No overall deadline: the stream may legitimately run longer
+            timeout=aiohttp.ClientTimeout(total=None, connect=60.0, sock_read=60.0),
+            # Cache DNS answers for 5 minutes instead of aiohttp's default 10 seconds
+            connector=aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, use_dns_cache=True, ttl_dns_cache=300
+            ),
+        )
+    return _session
+
+async def close_session() -> None:
+    """Close the shared HTTP session if it was created"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+# Parsed token file keyed by its st_mtime_ns, reused while the file is unchanged
+_token_cache: Optional[Tuple[int, dict]] = None
+
+def load_token_file() -> dict:
+    """Load the token file created by get_dev_jwt and validate its access token"""
+    global _token_cache
+    try:
+        mtime_ns = os.stat(TOKEN_FILE).st_mtime_ns
+    except FileNotFoundError:
         print(f"ERROR: {TOKEN_FILE} not found", file=sys.stderr)
         print("Run: ./get_dev_jwt", file=sys.stderr)
         sys.exit(1)
     
+    if _token_cache is not None and _token_cache[0] == mtime_ns:
+        return _token_cache[1]
+    
     try:
-        with open(TOKEN_FILE, 'r') as f:
-            token_data = json.load(f)
-        
-        access_token = token_data.get("access_token")
-        if not access_token:
-            print(f"ERROR: No access_token in {TOKEN_FILE}", file=sys.stderr)
-            sys.exit(1)
-            
-        return access_token
-        
+        token_data = orjson.loads(Path(TOKEN_FILE).read_bytes())
     except Exception as e:
         print(f"ERROR: Failed to load token: {e}", file=sys.stderr)
         sys.exit(1)
+    
+    if not token_data.get("access_token"):
+        print(f"ERROR: No access_token in {TOKEN_FILE}", file=sys.stderr)
+        sys.exit(1)
+    
+    _token_cache = (mtime_ns, token_data)
+    return token_data
+
+async def iter_sse_lines(stream: aiohttp.StreamReader) -> AsyncIterator[bytearray]:
+    """Yield newline-delimited lines (without line endings) from a raw byte stream"""
+    buf = bytearray()
+    find = buf.find
+    async for block in stream.iter_chunked(SSE_READ_CHUNK_SIZE):
+        buf += block
+        start = 0
+        while (nl := find(b"\n", start)) >= 0:
+            end = nl - 1 if nl > start and buf[nl - 1] == 0x0D else nl  # Drop \r of \r\n
+            yield buf[start:end]
+            start = nl + 1
+        del buf[:start]
+    if buf:
+        yield buf.rstrip(b"\r")
 
 async def stream_chat_completion(token: str, messages: list) -> None:
     """Stream chat from P8-Simulator with SSE"""
@@ -63,43 +125,67 @@ async def stream_chat_completion(token: str, messages: list) -> None:
     # P8-Simulator endpoint - provides rich markdown simulation 
     endpoint = f"{API_BASE}/api/v1/agent/p8-sim/chat/completions"
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        async with client.stream("POST", endpoint, json=payload, headers=headers) as response:
-            if response.status_code != 200:
-                error_text = await response.aread()
-                print(f"ERROR {response.status_code}: {error_text.decode()}", file=sys.stderr)
-                return
-
-            # Process SSE stream
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    data = line[6:]  # Remove "data: " prefix
-                    if data == "[DONE]":
-                        break
-                    try:
-                        # Parse OpenAI-format chunk
-                        chunk = json.loads(data)
-                        content = chunk["choices"][0]["delta"].get("content", "")
-                        if content:
-                            print(content, end="", flush=True)
-                    except (json.JSONDecodeError, KeyError, IndexError):
-                        continue  # Skip malformed chunks
+    session = get_session()
+    async with session.post(endpoint, json=payload, headers=headers) as response:
+        if response.status != 200:
+            error_text = await response.text()
+            print(f"ERROR {response.status}: {error_text}", file=sys.stderr)
+            return
+
+        # Process SSE stream; keep earlier print() output ahead of raw writes
+        sys.stdout.flush()
+        # Bind hot-path names locally to avoid global lookups per chunk
+        out = sys.stdout.buffer
+        write, flush = out.write, out.flush
+        loads, decode_error = orjson.loads, orjson.JSONDecodeError
+        prefix, prefix_len, done = SSE_DATA_PREFIX, SSE_DATA_PREFIX_LEN, SSE_DONE
+        # Terminals get every token immediately; pipes get batched writes
+        tty = out.isatty()
+        clock = asyncio.get_running_loop().time
+        interval = PIPE_FLUSH_INTERVAL
+        pending = bytearray()
+        last_flush = clock()
+        try:
+            async for line in iter_sse_lines(response.content):
+                if not line.startswith(prefix):
+                    continue
+                data = line[prefix_len:]
+                if data == done:
+                    break
+                try:
+                    # Parse OpenAI-format chunk
+                    chunk = loads(data)
+                    content = chunk["choices"][0]["delta"].get("content", "")
+                except (decode_error, KeyError, IndexError):
+                    continue  # Skip malformed chunks
+                if not content:
+                    continue
+                encoded = content.encode("utf-8")
+                if tty:
+                    write(encoded)
+                    flush()
+                    continue
+                pending += encoded
+                now = clock()
+                if b"\n" in encoded or now - last_flush > interval:
+                    write(pending)
+                    flush()
+                    pending.clear()
+                    last_flush = now
+        finally:
+            if pending:
+                write(pending)
+                flush()
 
 async def main():
     print("🔐 P8-FS JWT + SSE Streaming Sample")
     print("=" * 50)
     
     # Load token and show tenant info
-    token = load_jwt_token()
-    
-    # Show token info
-    try:
-        with open(TOKEN_FILE, 'r') as f:
-            token_data = json.load(f)
-        print(f"📧 Email: {token_data.get('email', 'unknown')}")
-        print(f"🔑 Tenant: {token_data.get('tenant_id', 'unknown')}")
-    except:
-        pass
+    token_data = load_token_file()
+    token = token_data["access_token"]
+    print(f"📧 Email: {token_data.get('email', 'unknown')}")
+    print(f"🔑 Tenant: {token_data.get('tenant_id', 'unknown')}")
     
     print(f"🤖 Streaming from P8-Simulator...")
     print("=" * 50)
@@ -111,9 +197,13 @@ async def main():
     ]
     
     # Stream response
-    await stream_chat_completion(token, messages)
+    try:
+        await stream_chat_completion(token, messages)
+    finally:
+        await close_session()
     print("\n" + "=" * 50)
     print("✅ Complete")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    runner = uvloop.run if uvloop else asyncio.run
+    runner(main())
\ No newline at end of file
@@ -4,9 +4,11 @@ Minimal P8FS S3 upload test
 Tests write access to tenant-test/uploads/yyyy/mm/dd/test.ext
 """
 
+import argparse
 import boto3
+import functools
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from botocore.client import Config
 from dotenv import load_dotenv
 
@@ -14,7 +16,33 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@functools.lru_cache(maxsize=4)
+def make_s3_client(endpoint, access_key, secret_key):
+    """Return a cached S3 client so repeated calls share one session and pool"""
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name="us-east-1",
+        config=Config(
+            signature_version="s3v4",
+            s3={"addressing_style": "path"},
+            max_pool_connections=50,
+            retries={"mode": "adaptive", "max_attempts": 3},
+        ),
+    )
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Test P8FS S3 write access")
+    parser.add_argument(
+        "--probe",
+        action="store_true",
+        help="List the bucket before uploading (diagnostic, one extra round trip)",
+    )
+    args = parser.parse_args()
+
     # Read credentials from .env (fallback to hardcoded for testing)
     access_key = os.getenv("S3_ACCESS_KEY")
     secret_key = os.getenv("S3_SECRET_KEY")
@@ -24,36 +52,34 @@ def main():
     print(f"Endpoint: {endpoint}")
 
     # S3 client with proper configuration
-    s3 = boto3.client(
-        "s3",
-        endpoint_url=endpoint,
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        region_name="us-east-1",
-        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
-    )
+    s3 = make_s3_client(endpoint, access_key, secret_key)
 
     # Upload path format: existing-bucket/uploads/yyyy/mm/dd/test.ext
-    now = datetime.utcnow()
-    s3_key = f"uploads/{now.strftime('%Y/%m/%d')}/test_{int(now.timestamp())}.txt"
+    now = datetime.now(timezone.utc)
+    ts = int(now.timestamp())
+    s3_key = f"uploads/{now.year:04d}/{now.month:02d}/{now.day:02d}/test_{ts}.txt"
     bucket = "existing-bucket"
 
-    # Test content
-    test_data = f"P8FS test upload {now.isoformat()}\n"
+    # Test content, encoded once so boto3 can send it without re-encoding
+    body = f"P8FS test upload {now.isoformat()}\n".encode("utf-8")
 
     try:
-        # Test list objects first
-        try:
-            response = s3.list_objects_v2(Bucket=bucket)
-            print(
-                f"List objects successful - found {response.get('KeyCount', 0)} objects"
-            )
-        except Exception as e:
-            print(f"List objects failed: {e}")
+        # Optionally test list access first; MaxKeys=1 keeps the probe cheap
+        if args.probe:
+            try:
+                response = s3.list_objects_v2(Bucket=bucket, MaxKeys=1)
+                state = "has objects" if response.get("KeyCount", 0) else "is empty"
+                print(f"List objects successful - bucket {state}")
+            except Exception as e:
+                print(f"List objects failed: {e}")
 
         # Upload
         s3.put_object(
-            Bucket=bucket, Key=s3_key, Body=test_data, ContentType="text/plain"
+            Bucket=bucket,
+            Key=s3_key,
+            Body=body,
+            ContentType="text/plain",
+            ContentLength=len(body),
         )
         print(f"Upload successful: {endpoint}/{bucket}/{s3_key}")
 
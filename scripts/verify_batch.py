@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Ed25519 Batch Verification
+
+Verifies many Ed25519 device signatures (e.g. produced with the signing example
+in get_dev_jwt.py) through a single `verify_batch` call.
+
+Today each signature is checked individually with libsodium via PyNaCl, which
+has no batch API. Callers only depend on `verify_batch`, so the loop can later
+be replaced by a true multiscalar batch verifier without touching call sites.
+
+Usage:
+    python verify_batch.py            # Self-check with 1000 random signatures
+    python verify_batch.py -n 10000   # Custom batch size
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Sequence
+
+from nacl.bindings import crypto_sign_open
+from nacl.exceptions import BadSignatureError
+from nacl.signing import SigningKey
+
+
+def verify_batch(
+    messages: Sequence[bytes],
+    signatures: Sequence[bytes],
+    public_keys: Sequence[bytes],
+) -> bool:
+    """Return True only if every signature is valid for its message and raw public key"""
+    if not len(messages) == len(signatures) == len(public_keys):
+        raise ValueError("messages, signatures and public_keys must have the same length")
+
+    for message, signature, public_key in zip(messages, signatures, public_keys):
+        try:
+            crypto_sign_open(signature + message, public_key)
+        except BadSignatureError:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-check Ed25519 batch verification")
+    parser.add_argument(
+        "-n", "--count",
+        type=int,
+        default=1000,
+        help="Number of signatures to verify (default: 1000)"
+    )
+    args = parser.parse_args()
+
+    keys = [SigningKey.generate() for _ in range(args.count)]
+    messages = [os.urandom(64) for _ in range(args.count)]
+    signatures = [key.sign(msg).signature for key, msg in zip(keys, messages)]
+    public_keys = [bytes(key.verify_key) for key in keys]
+
+    start = time.perf_counter()
+    valid = verify_batch(messages, signatures, public_keys)
+    elapsed = time.perf_counter() - start
+    print(f"Verified {args.count} signatures in {elapsed * 1000:.1f} ms: {'OK' if valid else 'FAILED'}")
+
+    # A single corrupted signature must fail the whole batch
+    if args.count:
+        signatures[-1] = bytes([signatures[-1][0] ^ 1]) + signatures[-1][1:]
+        if verify_batch(messages, signatures, public_keys):
+            print("ERROR: Corrupted signature was accepted", file=sys.stderr)
+            valid = False
+
+    if not valid:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()